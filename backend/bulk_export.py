@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Bulk export of Zoho Analytics reports for many vendor PANs.
+
+Exports run in parallel on a bounded worker pool. Rows are written as gzip-compressed
+NDJSON shards, one shard per (report, batch of PANs):
+
+    <output-dir>/<report_slug>/part-00000.ndjson.gz
+    <output-dir>/manifest.json
+
+Every row carries a "_pan" field. A shard is moved to its final name and recorded under
+"completed" in manifest.json only after all of its PANs exported successfully. A shard
+with failed PANs is left as part-NNNNN.ndjson.gz.partial and listed under "failed".
+Rerunning the same command resumes an interrupted or partially failed run by redoing
+just the shards that are not complete. Ctrl-C cancels queued shards, lets each running
+shard finish its current export and then drops it, records every shard that already
+finished and exits with status 130.
+
+Exports are not traced unless --trace-path is given, so bulk runs never crowd the
+backend's /chat traces out of TRACE_EXPORT_PATH.
+
+Usage:
+    python bulk_export.py --pans-file pans.txt --output-dir exports/
+    python bulk_export.py --pans-file pans.txt --reports invoice_dashboard_2,payment_report_1 --workers 8
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from dotenv import load_dotenv
+
+# Load credentials before the tools modules read them at import time.
+load_dotenv()
+
+from tools.tracing import tracer  # noqa: E402
+from tools.zoho_service import ZohoAnalyticsService, zoho_service  # noqa: E402
+
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ShardTask:
+    """One unit of work: a report exported for a contiguous batch of PANs."""
+
+    report_slug: str
+    batch_index: int
+    pans: Sequence[str]
+
+    @property
+    def shard_name(self) -> str:
+        return f"{self.report_slug}/part-{self.batch_index:05d}.ndjson.gz"
+
+
+@dataclass
+class ShardResult:
+    task: ShardTask
+    rows: int = 0
+    exports: int = 0
+    failed_pans: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    interrupted: bool = False
+
+
+class BulkExporter:
+    """Runs ShardTasks on a thread pool and keeps a checkpoint manifest up to date."""
+
+    def __init__(
+        self,
+        service: ZohoAnalyticsService,
+        output_dir: Path,
+        report_slugs: Sequence[str],
+        pans: Sequence[str],
+        workers: int = 4,
+        batch_size: int = 100,
+    ) -> None:
+        unknown = [slug for slug in report_slugs if slug not in service.available_reports]
+        if unknown:
+            raise KeyError(f"Unknown report slug(s): {', '.join(unknown)}")
+
+        self.service = service
+        self.output_dir = output_dir
+        self.report_slugs = list(report_slugs)
+        self.pans = list(pans)
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.manifest_path = output_dir / "manifest.json"
+        self._manifest_lock = threading.Lock()
+        self._manifest: Dict[str, Any] = {}
+        self._stop_event = threading.Event()
+
+    def run(self) -> Dict[str, Any]:
+        """Export every pending shard and return throughput statistics."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._manifest = self._load_manifest()
+        tasks = self.pending_tasks()
+        total_shards = len(self.report_slugs) * len(self._batches())
+        print(f"{total_shards - len(tasks)} of {total_shards} shards already complete, {len(tasks)} to export")
+
+        rows = exports = failed_shards = done = 0
+        started = time.monotonic()
+
+        def collect(result: ShardResult) -> None:
+            nonlocal rows, exports, failed_shards, done
+            if result.interrupted:
+                return
+            # Manifest first: it is the source of truth if a Ctrl-C lands mid-collect.
+            self._record(result)
+            done += 1
+            rows += result.rows
+            exports += result.exports
+            if result.failed_pans:
+                failed_shards += 1
+
+            elapsed = time.monotonic() - started
+            status = f"{len(result.failed_pans)} PAN(s) failed" if result.failed_pans else "ok"
+            print(
+                f"[{done}/{len(tasks)}] {result.task.shard_name}: {result.rows} rows in "
+                f"{result.seconds:.1f}s ({status}) | {_rate(rows, elapsed):.1f} rows/s, "
+                f"{_rate(exports, elapsed) * 60:.1f} exports/min"
+            )
+
+        interrupted = False
+        collected: Set[Future] = set()
+        futures: List[Future] = []
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures.extend(executor.submit(self._run_task, task) for task in tasks)
+            for future in as_completed(futures):
+                collect(future.result())
+                collected.add(future)
+        except KeyboardInterrupt:
+            interrupted = True
+            print("Interrupted; cancelling queued shards and saving finished ones")
+            # Queued tasks never start; running ones drop their shard after the current
+            # export. Waiting for them means every shard that did finish is recorded below.
+            self._stop_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future in futures:
+                if future in collected or not future.done() or future.cancelled() or future.exception() is not None:
+                    continue
+                collect(future.result())
+        else:
+            executor.shutdown(wait=True)
+
+        elapsed = time.monotonic() - started
+        return {
+            "shards_exported": done - failed_shards,
+            "shards_failed": failed_shards,
+            "shards_pending": len(tasks) - done,
+            "interrupted": interrupted,
+            "rows": rows,
+            "exports": exports,
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(_rate(rows, elapsed), 2),
+            "exports_per_minute": round(_rate(exports, elapsed) * 60, 2),
+        }
+
+    def pending_tasks(self) -> List[ShardTask]:
+        completed = self._manifest.get("completed", {})
+        tasks: List[ShardTask] = []
+        for slug in self.report_slugs:
+            for batch_index, batch in enumerate(self._batches()):
+                task = ShardTask(slug, batch_index, batch)
+                if task.shard_name not in completed:
+                    tasks.append(task)
+        return tasks
+
+    def _batches(self) -> List[List[str]]:
+        return [self.pans[i:i + self.batch_size] for i in range(0, len(self.pans), self.batch_size)]
+
+    def _run_task(self, task: ShardTask) -> ShardResult:
+        result = ShardResult(task=task)
+        started = time.monotonic()
+        shard_path = self.output_dir / task.shard_name
+        shard_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = shard_path.with_name(shard_path.name + ".tmp")
+        partial_path = shard_path.with_name(shard_path.name + ".partial")
+
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as shard:
+                for pan in task.pans:
+                    if self._stop_event.is_set():
+                        result.interrupted = True
+                        break
+                    try:
+                        data = self.service.export_report(task.report_slug, pan)
+                    except Exception as exc:
+                        print(f"Error exporting '{task.report_slug}' for PAN {pan}: {exc}")
+                        data = None
+                    result.exports += 1
+                    if data is None:
+                        result.failed_pans.append(pan)
+                        continue
+                    for row in _iter_rows(data):
+                        record = {"_pan": pan, **row} if isinstance(row, dict) else {"_pan": pan, "value": row}
+                        shard.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                        result.rows += 1
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        # Once stopped, an unfinished shard is dropped rather than completed, even if its
+        # last PAN just exported, so Ctrl-C costs at most one export per worker.
+        if result.interrupted or self._stop_event.is_set():
+            result.interrupted = True
+            tmp_path.unlink(missing_ok=True)
+        elif result.failed_pans:
+            # Missing some PANs' rows: keep it visibly incomplete until a rerun succeeds.
+            os.replace(tmp_path, partial_path)
+        else:
+            os.replace(tmp_path, shard_path)
+            partial_path.unlink(missing_ok=True)
+        result.seconds = time.monotonic() - started
+        return result
+
+    def _record(self, result: ShardResult) -> None:
+        entry = {
+            "report": result.task.report_slug,
+            "batch": result.task.batch_index,
+            "pans": len(result.task.pans),
+            "rows": result.rows,
+            "seconds": round(result.seconds, 2),
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._manifest_lock:
+            if result.failed_pans:
+                self._manifest["failed"][result.task.shard_name] = {
+                    **entry,
+                    "file": f"{result.task.shard_name}.partial",
+                    "failed_pans": result.failed_pans,
+                }
+            else:
+                self._manifest["failed"].pop(result.task.shard_name, None)
+                self._manifest["completed"][result.task.shard_name] = entry
+            self._write_manifest()
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        run_config = {
+            "version": MANIFEST_VERSION,
+            "batch_size": self.batch_size,
+            "pan_count": len(self.pans),
+            "pan_digest": hashlib.sha256("\n".join(self.pans).encode("utf-8")).hexdigest(),
+        }
+        if self.manifest_path.exists():
+            with self.manifest_path.open("r", encoding="utf-8") as file_handle:
+                manifest = json.load(file_handle)
+            mismatched = [key for key, value in run_config.items() if manifest.get(key) != value]
+            if mismatched:
+                raise ValueError(
+                    f"{self.manifest_path} was written for a different PAN list or batch size "
+                    f"({', '.join(mismatched)} differ); use a new --output-dir or pass --restart"
+                )
+            manifest.setdefault("completed", {})
+            manifest.setdefault("failed", {})
+            return manifest
+        return {**run_config, "completed": {}, "failed": {}}
+
+    def _write_manifest(self) -> None:
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as file_handle:
+            json.dump(self._manifest, file_handle, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def _iter_rows(data: Any) -> Iterable[Any]:
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and isinstance(data.get("data"), list):
+        return data["data"]
+    return [data]
+
+
+def _rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds > 0 else 0.0
+
+
+def read_pans(path: Optional[Path], inline: Sequence[str]) -> List[str]:
+    """Collect PANs from a file (one per line, '#' comments allowed) and --pan flags, de-duplicated in order."""
+    raw: List[str] = list(inline)
+    if path is not None:
+        with path.open("r", encoding="utf-8-sig") as file_handle:
+            raw.extend(line.split("#", 1)[0] for line in file_handle)
+    seen: Dict[str, None] = {}
+    for value in raw:
+        pan = value.strip().split(",", 1)[0].strip().upper()
+        if pan:
+            seen.setdefault(pan, None)
+    return list(seen)
+
+
+def configure_tracing(trace_path: Optional[Path]) -> None:
+    """Trace exports into trace_path (at TRACE_SAMPLE_RATE), or not at all when it is None."""
+    if trace_path is None:
+        tracer.configure(sample_rate=0.0)
+    else:
+        tracer.configure(export_path=trace_path)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export Zoho Analytics reports for many vendor PANs.")
+    parser.add_argument("--pans-file", type=Path, help="File with one PAN per line (first CSV column is used)")
+    parser.add_argument("--pan", action="append", default=[], help="PAN to export (repeatable)")
+    parser.add_argument("--reports", default="", help="Comma-separated report slugs (default: every report in the CSV)")
+    parser.add_argument("--output-dir", type=Path, default=Path("bulk_exports"), help="Directory for shards and manifest.json")
+    parser.add_argument("--workers", type=int, default=4, help="Number of exports to run in parallel (default: 4)")
+    parser.add_argument("--batch-size", type=int, default=100, help="PANs per shard (default: 100)")
+    parser.add_argument("--trace-path", type=Path, help="Write export traces to this JSONL file (default: tracing off)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing manifest and start over")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    configure_tracing(args.trace_path)
+
+    pans = read_pans(args.pans_file, args.pan)
+    if not pans:
+        print("No PANs given; use --pans-file and/or --pan")
+        return 2
+
+    if not zoho_service.client.is_configured():
+        print("Zoho MCP is not configured. Set ZOHO_WORKSPACE_ID, ZOHO_CLIENT_ID, ZOHO_CLIENT_SECRET and ZOHO_REFRESH_TOKEN in backend/.env")
+        return 2
+
+    report_slugs = [slug.strip() for slug in args.reports.split(",") if slug.strip()] or list(zoho_service.available_reports)
+
+    if args.restart:
+        (args.output_dir / "manifest.json").unlink(missing_ok=True)
+
+    try:
+        exporter = BulkExporter(
+            zoho_service,
+            args.output_dir,
+            report_slugs,
+            pans,
+            workers=args.workers,
+            batch_size=args.batch_size,
+        )
+        stats = exporter.run()
+    except (KeyError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return 2
+
+    print(json.dumps(stats, indent=2))
+    if stats["interrupted"]:
+        return 130
+    return 1 if stats["shards_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
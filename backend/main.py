@@ -1,10 +1,12 @@
 import os
 import google.generativeai as genai
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from dotenv import load_dotenv
 from tools.zoho import tools_list
+from tools.tracing import Span, tracer
+from tools.report_refresher import report_refresher
 from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
@@ -59,12 +61,21 @@ class ChatResponse(BaseModel):
     response: str
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, http_response: Response):
+    with tracer.start_span("chat_endpoint", **{"chat.vendor_id": request.vendor_id or "", "chat.request_chars": len(request.message)}) as span:
+        http_response.headers["X-Trace-Id"] = span.trace_id
+        result = _handle_chat(request, span)
+        span.set_attribute("chat.response_chars", len(result.response))
+        return result
+
+
+def _handle_chat(request: ChatRequest, span: Span) -> ChatResponse:
     try:
         # Check if API key is set, otherwise return mock response
         api_key = os.environ.get("GOOGLE_API_KEY")
         if not api_key or api_key.startswith("your_"):
              # Simple mock logic for testing without API key
+            span.set_attribute("chat.mode", "mock")
             msg = request.message.lower()
             if "invoice" in msg:
                 return ChatResponse(response="Here are your invoices:\n\n| Invoice | Date | Amount | Status |\n|---|---|---|---|\n| INV-001 | 2024-01-15 | $5000.00 | Paid |\n| INV-002 | 2024-02-20 | $7500.50 | Pending |")
@@ -75,9 +86,12 @@ async def chat_endpoint(request: ChatRequest):
             else:
                 return ChatResponse(response="I can help you with invoices, payments, and statements. What would you like to know?")
 
-        response = chat.send_message(request.message)
+        span.set_attribute("chat.mode", "gemini")
+        with tracer.start_span("gemini.send_message"):
+            response = chat.send_message(request.message)
         return ChatResponse(response=response.text)
     except Exception as e:
+        span.record_exception(e)
         print(f"Error: {e}")
         import traceback
         traceback.print_exc()
@@ -85,6 +99,17 @@ async def chat_endpoint(request: ChatRequest):
         return ChatResponse(response=f"I'm currently running in offline mode. (Error: {str(e)})")
 
 
+@app.on_event("startup")
+async def start_report_refresher():
+    if os.getenv("ZOHO_REFRESH_ENABLED", "true").lower() == "true":
+        report_refresher.start()
+
+
+@app.on_event("shutdown")
+async def stop_report_refresher():
+    report_refresher.stop()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
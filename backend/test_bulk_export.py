@@ -0,0 +1,151 @@
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from bulk_export import BulkExporter, configure_tracing, read_pans
+from tools.tracing import tracer
+from tools.zoho_service import ZohoAnalyticsService
+
+
+class TestBulkExport(unittest.TestCase):
+    def setUp(self):
+        self.service = ZohoAnalyticsService()
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service.export_dir = self.temp_dir / "zoho"
+        self.service.export_report = MagicMock(side_effect=lambda slug, pan: [{"slug": slug, "n": 1}, {"slug": slug, "n": 2}])
+        self.output_dir = self.temp_dir / "out"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _exporter(self, pans, **kwargs):
+        return BulkExporter(self.service, self.output_dir, ["invoice_dashboard_2", "payment_report_1"], pans, batch_size=2, **kwargs)
+
+    def _read_shard(self, name):
+        with gzip.open(self.output_dir / name, "rt", encoding="utf-8") as shard:
+            return [json.loads(line) for line in shard]
+
+    def test_writes_compressed_shards_and_manifest(self):
+        stats = self._exporter(["PAN1", "PAN2", "PAN3"], workers=3).run()
+
+        self.assertEqual(stats["exports"], 6)
+        self.assertEqual(stats["rows"], 12)
+        self.assertEqual(stats["shards_failed"], 0)
+        rows = self._read_shard("invoice_dashboard_2/part-00000.ndjson.gz")
+        self.assertEqual([row["_pan"] for row in rows], ["PAN1", "PAN1", "PAN2", "PAN2"])
+
+        manifest = json.loads((self.output_dir / "manifest.json").read_text(encoding="utf-8"))
+        self.assertEqual(len(manifest["completed"]), 4)
+        self.assertEqual(manifest["completed"]["payment_report_1/part-00001.ndjson.gz"]["rows"], 2)
+
+    def test_resume_only_reruns_failed_shards(self):
+        self.service.export_report.side_effect = lambda slug, pan: None if pan == "PAN3" else [{"n": 1}]
+        first = self._exporter(["PAN1", "PAN2", "PAN3"]).run()
+        self.assertEqual(first["shards_failed"], 2)
+
+        self.service.export_report.reset_mock()
+        self.service.export_report.side_effect = lambda slug, pan: [{"n": 1}]
+        second = self._exporter(["PAN1", "PAN2", "PAN3"]).run()
+
+        self.assertEqual(second["shards_failed"], 0)
+        self.assertEqual(second["exports"], 2)
+        self.assertEqual({call.args[1] for call in self.service.export_report.call_args_list}, {"PAN3"})
+
+    def test_failed_shard_is_left_partial_until_it_succeeds(self):
+        self.service.export_report.side_effect = lambda slug, pan: None if pan == "PAN2" else [{"n": 1}]
+        self._exporter(["PAN1", "PAN2"]).run()
+
+        shard = self.output_dir / "invoice_dashboard_2/part-00000.ndjson.gz"
+        self.assertFalse(shard.exists())
+        self.assertTrue(shard.with_name(shard.name + ".partial").exists())
+
+        self.service.export_report.side_effect = lambda slug, pan: [{"n": 1}]
+        self._exporter(["PAN1", "PAN2"]).run()
+
+        self.assertTrue(shard.exists())
+        self.assertFalse(shard.with_name(shard.name + ".partial").exists())
+
+    def test_interrupt_cancels_queued_shards_and_keeps_finished_ones(self):
+        pans = [f"PAN{i}" for i in range(200)]
+        exporter = BulkExporter(self.service, self.output_dir, ["invoice_dashboard_2"], pans, workers=2, batch_size=1)
+        calls = []
+        lock = threading.Lock()
+
+        def export(slug, pan):
+            with lock:
+                calls.append(pan)
+                if len(calls) == 5:
+                    # What Ctrl-C does, at a fixed point: stop the workers and raise in run().
+                    exporter._stop_event.set()
+                    raise KeyboardInterrupt
+            return [{"n": 1}]
+
+        self.service.export_report.side_effect = export
+
+        stats = exporter.run()
+
+        self.assertTrue(stats["interrupted"])
+        self.assertLessEqual(len(calls), 6)
+        manifest = json.loads((self.output_dir / "manifest.json").read_text(encoding="utf-8"))
+        self.assertEqual(len(manifest["completed"]), stats["shards_exported"])
+        on_disk = {
+            path.relative_to(self.output_dir).as_posix() for path in (self.output_dir / "invoice_dashboard_2").iterdir()
+        }
+        # Every final-named shard is in the manifest, and nothing half-written is left behind.
+        self.assertEqual(on_disk, set(manifest["completed"]))
+
+        # Resuming exports only what the interrupted run did not finish.
+        self.service.export_report.side_effect = lambda slug, pan: [{"n": 1}]
+        resumed = BulkExporter(self.service, self.output_dir, ["invoice_dashboard_2"], pans, batch_size=1).run()
+        self.assertEqual(resumed["exports"], 200 - stats["shards_exported"])
+
+    def test_stop_after_last_pan_drops_the_shard(self):
+        exporter = BulkExporter(self.service, self.output_dir, ["invoice_dashboard_2"], ["PAN1"], batch_size=1)
+
+        def export(slug, pan):
+            exporter._stop_event.set()
+            return [{"n": 1}]
+
+        self.service.export_report.side_effect = export
+        self.output_dir.mkdir(parents=True)
+
+        result = exporter._run_task(exporter.pending_tasks()[0])
+
+        self.assertTrue(result.interrupted)
+        self.assertEqual(list((self.output_dir / "invoice_dashboard_2").iterdir()), [])
+
+    def test_tracing_is_off_unless_trace_path_given(self):
+        original_rate, original_path = tracer.sample_rate, tracer.export_path
+        try:
+            configure_tracing(None)
+            self.assertEqual(tracer.sample_rate, 0.0)
+
+            configure_tracing(self.temp_dir / "bulk_traces.jsonl")
+            self.assertEqual(tracer.export_path, self.temp_dir / "bulk_traces.jsonl")
+        finally:
+            tracer.configure(sample_rate=original_rate, export_path=original_path)
+
+    def test_manifest_for_other_pan_list_is_rejected(self):
+        self._exporter(["PAN1", "PAN2"]).run()
+
+        with self.assertRaises(ValueError):
+            self._exporter(["PAN1", "PAN9"]).run()
+
+    def test_unknown_report_slug_is_rejected(self):
+        with self.assertRaises(KeyError):
+            BulkExporter(self.service, self.output_dir, ["no_such_report"], ["PAN1"])
+
+    def test_read_pans_dedupes_and_skips_comments(self):
+        pans_file = self.temp_dir / "pans.csv"
+        pans_file.write_text("# vendors\naamca0969r,Acme\n\nBBBCB1234X\nAAMCA0969R\n", encoding="utf-8")
+
+        self.assertEqual(read_pans(pans_file, ["ZZZZZ0000Z"]), ["ZZZZZ0000Z", "AAMCA0969R", "BBBCB1234X"])
+
+
+if __name__ == "__main__":
+    unittest.main()
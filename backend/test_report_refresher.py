@@ -0,0 +1,157 @@
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+
+from tools.report_refresher import ReportRefresher
+from tools.tracing import tracer
+from tools.zoho_service import CachedReport, ZohoAnalyticsService
+
+
+class TestReportRefresher(unittest.TestCase):
+    def setUp(self):
+        self.service = ZohoAnalyticsService()
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.original_trace_path = tracer.export_path
+        tracer.configure(export_path=self.temp_dir / "traces.jsonl")
+        self.service.export_dir = self.temp_dir
+        self.service.client = MagicMock()
+        self.service.client.workspace_id = "TEST_WORKSPACE"
+        self.service.client.is_configured.return_value = True
+        self.service.cache_ttl = 300
+        self.service.cache_stale_ttl = 900
+
+        self.refresher = ReportRefresher(self.service)
+        self.refresher.active_hours = None
+        self.refresher.min_hits = 2
+
+    def tearDown(self):
+        self.refresher.stop()
+        tracer.configure(export_path=self.original_trace_path)
+        shutil.rmtree(self.temp_dir)
+
+    def _export_rows(self, rows):
+        def export(tool_name, arguments):
+            Path(arguments["response_file_path"]).write_text(json.dumps(rows), encoding="utf-8")
+
+        self.service.client.call_tool.side_effect = export
+
+    def test_fresh_cache_entry_skips_export(self):
+        slug = "invoice_dashboard_2"
+        self._export_rows([{"Invoice": "INV-001"}])
+
+        first = self.service.fetch_report(slug, "TEST_PAN")
+        second = self.service.fetch_report(slug, "TEST_PAN")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.service.client.call_tool.call_count, 1)
+
+    def test_stale_entry_is_served_and_refresh_requested(self):
+        slug = "invoice_dashboard_2"
+        stale_rows = [{"Invoice": "OLD"}]
+        self.service._cache[(slug, "TEST_PAN")] = CachedReport(rows=stale_rows, fetched_at=time.time() - 400)
+        self.service.refresher = MagicMock()
+
+        result = self.service.fetch_report(slug, "TEST_PAN")
+
+        self.assertEqual(result, stale_rows)
+        self.service.client.call_tool.assert_not_called()
+        self.service.refresher.request_refresh.assert_called_once_with(slug, "TEST_PAN")
+
+    def test_only_repeatedly_requested_pairs_are_hot(self):
+        now = time.time()
+        self.refresher.record_access("invoice_dashboard_2", "HOT_PAN", now)
+        self.refresher.record_access("invoice_dashboard_2", "HOT_PAN", now)
+        self.refresher.record_access("invoice_dashboard_2", "COLD_PAN", now)
+        self.refresher.record_access("payment_report_1", "OLD_PAN", now - 3600)
+        self.refresher.record_access("payment_report_1", "OLD_PAN", now - 3600)
+
+        self.assertEqual(self.refresher.hot_keys(now), [("invoice_dashboard_2", "HOT_PAN")])
+
+    def test_run_once_respects_concurrency_budget(self):
+        self.refresher.max_concurrency = 1
+        self.refresher.start()
+        self.service.refresh_report = MagicMock(side_effect=lambda slug, pan: time.sleep(0.2))
+        now = time.time()
+        for pan in ("PAN_A", "PAN_B"):
+            self.refresher.record_access("invoice_dashboard_2", pan, now)
+            self.refresher.record_access("invoice_dashboard_2", pan, now)
+
+        self.assertEqual(self.refresher.run_once(now), 1)
+
+    def test_run_once_skips_recently_refreshed_pairs(self):
+        self.refresher.start()
+        self.service.refresh_report = MagicMock()
+        now = time.time()
+        self.service._cache[("invoice_dashboard_2", "TEST_PAN")] = CachedReport(rows=[], fetched_at=now)
+        self.refresher.record_access("invoice_dashboard_2", "TEST_PAN", now)
+        self.refresher.record_access("invoice_dashboard_2", "TEST_PAN", now)
+
+        self.assertEqual(self.refresher.run_once(now), 0)
+
+    def test_expired_entries_are_evicted(self):
+        now = time.time()
+        self.service._cache[("invoice_dashboard_2", "OLD_PAN")] = CachedReport(rows=[], fetched_at=now - 1200)
+        self.service._cache[("invoice_dashboard_2", "STALE_PAN")] = CachedReport(rows=[], fetched_at=now - 400)
+
+        self.assertEqual(self.service.prune_cache(now), 1)
+        self.assertIsNone(self.service.get_cached("invoice_dashboard_2", "OLD_PAN"))
+        self.assertIsNotNone(self.service.get_cached("invoice_dashboard_2", "STALE_PAN"))
+
+    def test_active_hours_use_configured_timezone(self):
+        self.refresher.active_hours = (9, 21)
+        self.refresher.timezone = ZoneInfo("Asia/Kolkata")
+        # 04:00 UTC is 09:30 IST; 16:00 UTC is 21:30 IST.
+        morning_utc = datetime(2024, 1, 15, 4, 0, tzinfo=timezone.utc).timestamp()
+        evening_utc = datetime(2024, 1, 15, 16, 0, tzinfo=timezone.utc).timestamp()
+
+        self.assertTrue(self.refresher._is_active(morning_utc))
+        self.assertFalse(self.refresher._is_active(evening_utc))
+
+    def test_miss_waits_for_in_flight_refresh_instead_of_exporting(self):
+        slug = "invoice_dashboard_2"
+        refresh_started = threading.Event()
+        release_refresh = threading.Event()
+
+        def export(tool_name, arguments):
+            Path(arguments["response_file_path"]).write_text(json.dumps([{"Invoice": "NEW"}]), encoding="utf-8")
+            if not refresh_started.is_set():
+                refresh_started.set()
+                release_refresh.wait(timeout=5)
+
+        self.service.client.call_tool.side_effect = export
+        self.refresher.start()
+        self.assertTrue(self.refresher.request_refresh(slug, "TEST_PAN"))
+        refresh_started.wait(timeout=5)
+
+        results = []
+        live = threading.Thread(target=lambda: results.append(self.service.fetch_report(slug, "TEST_PAN")))
+        live.start()
+        time.sleep(0.05)
+        release_refresh.set()
+        live.join(timeout=5)
+
+        self.assertEqual(results, [[{"Invoice": "NEW"}]])
+        self.assertEqual(self.service.client.call_tool.call_count, 1)
+
+    def test_wait_for_refresh_returns_immediately_when_idle(self):
+        self.assertFalse(self.refresher.wait_for_refresh("invoice_dashboard_2", "TEST_PAN"))
+
+    def test_refresh_report_updates_cache(self):
+        slug = "invoice_dashboard_2"
+        refreshed_rows = [{"Invoice": "NEW"}]
+        self._export_rows(refreshed_rows)
+
+        self.service.refresh_report(slug, "TEST_PAN")
+
+        self.assertEqual(self.service.get_cached(slug, "TEST_PAN").rows, refreshed_rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from tools.mcp_client import ZohoMCPClient
+from tools.tracing import Tracer
+from tools.zoho_service import ZohoAnalyticsService
+import tools.mcp_client as mcp_client_module
+import tools.zoho_service as zoho_service_module
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.tracer = Tracer()
+        self.tracer.configure(sample_rate=1.0, export_path=self.temp_dir / "traces.jsonl")
+
+    def tearDown(self):
+        self.tracer._close_logger()
+        shutil.rmtree(self.temp_dir)
+
+    def _read_spans(self):
+        with self.tracer.export_path.open("r", encoding="utf-8") as file_handle:
+            records = [json.loads(line) for line in file_handle if line.strip()]
+        return [
+            span
+            for record in records
+            for resource_spans in record["resourceSpans"]
+            for scope_spans in resource_spans["scopeSpans"]
+            for span in scope_spans["spans"]
+        ]
+
+    def test_child_spans_share_trace_and_link_to_parent(self):
+        with self.tracer.start_span("parent") as parent:
+            with self.tracer.start_span("child", size=42):
+                pass
+
+        spans = {span["name"]: span for span in self._read_spans()}
+        self.assertEqual(spans["child"]["traceId"], parent.trace_id)
+        self.assertEqual(spans["child"]["parentSpanId"], parent.span_id)
+        self.assertEqual(spans["parent"]["parentSpanId"], "")
+        self.assertIn({"key": "size", "value": {"intValue": "42"}}, spans["child"]["attributes"])
+
+    def test_export_uses_otlp_json_envelope(self):
+        with self.tracer.start_span("root"):
+            pass
+
+        with self.tracer.export_path.open("r", encoding="utf-8") as file_handle:
+            (record,) = [json.loads(line) for line in file_handle]
+        (resource_spans,) = record["resourceSpans"]
+        self.assertIn(
+            {"key": "service.name", "value": {"stringValue": "swiggy-vendor-chatbot"}},
+            resource_spans["resource"]["attributes"],
+        )
+        (scope_spans,) = resource_spans["scopeSpans"]
+        self.assertEqual(scope_spans["scope"]["name"], Tracer.SCOPE_NAME)
+        self.assertEqual(scope_spans["spans"][0]["name"], "root")
+
+    def test_unsampled_trace_is_not_exported(self):
+        self.tracer.configure(sample_rate=0.0)
+
+        with self.tracer.start_span("parent"):
+            with self.tracer.start_span("child"):
+                pass
+
+        self.assertFalse(self.tracer.export_path.exists())
+
+    def test_exception_marks_span_as_error(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.start_span("failing"):
+                raise ValueError("boom")
+
+        (span,) = self._read_spans()
+        self.assertEqual(span["status"], {"code": "STATUS_CODE_ERROR", "message": "boom"})
+
+    def test_fetch_report_records_row_count(self):
+        service = ZohoAnalyticsService()
+        service.export_dir = self.temp_dir
+        service.client = MagicMock()
+        service.client.is_configured.return_value = True
+        service.client.call_tool.side_effect = lambda tool_name, arguments: Path(
+            arguments["response_file_path"]
+        ).write_text(json.dumps([{"a": 1}, {"a": 2}]), encoding="utf-8")
+
+        original_tracer = zoho_service_module.tracer
+        zoho_service_module.tracer = self.tracer
+        try:
+            service.fetch_report("invoice_dashboard_2", "TEST_PAN")
+        finally:
+            zoho_service_module.tracer = original_tracer
+
+        spans = {span["name"]: span for span in self._read_spans()}
+        self.assertIn("zoho.read_export", spans)
+        self.assertIn(
+            {"key": "report.row_count", "value": {"intValue": "2"}},
+            spans["zoho.fetch_report"]["attributes"],
+        )
+
+    def test_mcp_spawn_span_includes_server_startup(self):
+        def readline():
+            if process.stdout.readline.call_count == 1:
+                time.sleep(0.05)  # server starting up before it answers initialize
+                return json.dumps({"jsonrpc": "2.0", "id": 1, "result": {}}) + "\n"
+            return json.dumps({"jsonrpc": "2.0", "id": 2, "result": {"ok": True}}) + "\n"
+
+        process = MagicMock()
+        process.stdout.readline.side_effect = readline
+        client = ZohoMCPClient()
+        client.is_configured = MagicMock(return_value=True)
+
+        with patch.object(mcp_client_module, "tracer", self.tracer), patch.object(
+            mcp_client_module.subprocess, "Popen", return_value=process
+        ):
+            self.assertEqual(client.call_tool("export_view", {}), {"ok": True})
+
+        spans = {span["name"]: span for span in self._read_spans()}
+
+        def duration_ms(name):
+            return (int(spans[name]["endTimeUnixNano"]) - int(spans[name]["startTimeUnixNano"])) / 1_000_000
+
+        self.assertGreaterEqual(duration_ms("mcp.spawn"), 50)
+        self.assertLess(duration_ms("mcp.handshake"), 50)
+        self.assertEqual(spans["mcp.spawn"]["parentSpanId"], spans["mcp.call_tool"]["spanId"])
+        process.terminate.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
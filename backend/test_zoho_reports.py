@@ -1,9 +1,12 @@
+import json
 import shutil
 import tempfile
+import threading
 import unittest
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import ANY, MagicMock
 
+from tools.tracing import tracer
 from tools.zoho_service import ZohoAnalyticsService
 
 
@@ -11,18 +14,24 @@ class TestZohoReports(unittest.TestCase):
     def setUp(self):
         self.service = ZohoAnalyticsService()
         self.temp_dir = Path(tempfile.mkdtemp())
+        self.original_trace_path = tracer.export_path
+        tracer.configure(export_path=self.temp_dir / "traces.jsonl")
         self.service.export_dir = self.temp_dir
         self.service.client = MagicMock()
         self.service.client.workspace_id = "TEST_WORKSPACE"
         self.service.client.is_configured.return_value = True
 
     def tearDown(self):
+        tracer.configure(export_path=self.original_trace_path)
         shutil.rmtree(self.temp_dir)
 
+    def _assert_unique_export_path(self, slug):
+        output_path = Path(self.service.client.call_tool.call_args.args[1]["response_file_path"])
+        self.assertEqual(output_path.parent, self.temp_dir / "exports")
+        self.assertRegex(output_path.name, rf"^{slug}_[0-9a-f]{{32}}\.json$")
+
     def test_fetch_invoice_dashboard_report(self):
         slug = "invoice_dashboard_2"
-        expected_path = str(self.temp_dir / f"{slug}.json")
-
         self.service.fetch_report(slug, "TEST_PAN")
 
         self.service.client.call_tool.assert_called_with(
@@ -32,14 +41,13 @@ class TestZohoReports(unittest.TestCase):
                 "view_id": "234338000007714196",
                 "criteria": "\"Invoice  Query Table\".\"PAN Number\" = 'TEST_PAN'",
                 "response_file_format": "json",
-                "response_file_path": expected_path,
+                "response_file_path": ANY,
             },
         )
+        self._assert_unique_export_path(slug)
 
     def test_default_pan_is_used(self):
         slug = "ar_invoice_report_2"
-        expected_path = str(self.temp_dir / f"{slug}.json")
-
         self.service.fetch_report(slug)
 
         self.service.client.call_tool.assert_called_with(
@@ -49,9 +57,51 @@ class TestZohoReports(unittest.TestCase):
                 "view_id": "234338000007665998",
                 "criteria": "\"AR Invoice - Query Table\".\"PAN\" = 'AAMCA0969R'",
                 "response_file_format": "json",
-                "response_file_path": expected_path,
+                "response_file_path": ANY,
             },
         )
+        self._assert_unique_export_path(slug)
+
+    def test_failed_export_never_returns_another_pans_rows(self):
+        slug = "invoice_dashboard_2"
+
+        def export_only_for_pan_a(tool_name, arguments):
+            if "PAN_A" in arguments["criteria"]:
+                Path(arguments["response_file_path"]).write_text(json.dumps([{"PAN": "PAN_A"}]), encoding="utf-8")
+
+        self.service.client.call_tool.side_effect = export_only_for_pan_a
+        # A leftover file from the old shared export path must not be picked up either.
+        (self.temp_dir / f"{slug}.json").write_text(json.dumps([{"PAN": "PAN_A"}]), encoding="utf-8")
+
+        self.assertEqual(self.service.fetch_report(slug, "PAN_A"), [{"PAN": "PAN_A"}])
+        self.assertIsNone(self.service.fetch_report(slug, "PAN_B"))
+        self.assertIsNone(self.service.get_cached(slug, "PAN_B"))
+
+    def test_concurrent_exports_of_same_pair_do_not_clobber_each_other(self):
+        slug = "invoice_dashboard_2"
+        first_written = threading.Event()
+        second_finished = threading.Event()
+
+        def export(tool_name, arguments):
+            Path(arguments["response_file_path"]).write_text(json.dumps([{"PAN": "PANX"}]), encoding="utf-8")
+            if not first_written.is_set():
+                # Hold the first export open while a second one for the same pair runs to completion.
+                first_written.set()
+                second_finished.wait(timeout=5)
+
+        self.service.client.call_tool.side_effect = export
+        first_result = []
+        first = threading.Thread(target=lambda: first_result.append(self.service.export_report(slug, "PANX")))
+        first.start()
+        first_written.wait(timeout=5)
+
+        second_result = self.service.export_report(slug, "PANX")
+        second_finished.set()
+        first.join(timeout=5)
+
+        self.assertEqual(second_result, [{"PAN": "PANX"}])
+        self.assertEqual(first_result, [[{"PAN": "PANX"}]])
+        self.assertEqual(list((self.temp_dir / "exports").iterdir()), [])
 
     def test_all_reports_loaded_from_csv(self):
         self.assertGreaterEqual(len(self.service.available_reports), 13)
@@ -3,6 +3,8 @@ import json
 import os
 from typing import Optional, Dict, Any
 
+from .tracing import Span, tracer
+
 class ZohoMCPClient:
     """
     A client to interact with the Zoho Analytics MCP server via Docker.
@@ -46,36 +48,48 @@ class ZohoMCPClient:
             print("Zoho MCP not configured")
             return None
             
-        try:
-            # Construct Docker command
-            # Determine execution mode
-            execution_mode = os.getenv("MCP_EXECUTION_MODE", "docker")
-            
-            if execution_mode == "local":
-                # Run directly as a command (installed via pip)
-                cmd = ["zoho-analytics-mcp"]
-                # Pass environment variables to the subprocess
-                env = os.environ.copy()
-                env.update({
-                    "ACCOUNTS_SERVER_URL": self.accounts_url,
-                    "ANALYTICS_SERVER_URL": self.analytics_url,
-                    "ANALYTICS_CLIENT_ID": self.client_id,
-                    "ANALYTICS_CLIENT_SECRET": self.client_secret,
-                    "ANALYTICS_REFRESH_TOKEN": self.refresh_token,
-                })
-            else:
-                # Default: Run via Docker
-                cmd = [
-                    "docker", "run", "-i", "--rm",
-                    "-e", f"ACCOUNTS_SERVER_URL={self.accounts_url}",
-                    "-e", f"ANALYTICS_SERVER_URL={self.analytics_url}",
-                    "-e", f"ANALYTICS_CLIENT_ID={self.client_id}",
-                    "-e", f"ANALYTICS_CLIENT_SECRET={self.client_secret}",
-                    "-e", f"ANALYTICS_REFRESH_TOKEN={self.refresh_token}",
-                    "zohoanalytics/mcp-server:latest"
-                ]
-                env = None
+        with tracer.start_span("mcp.call_tool", **{"mcp.tool_name": tool_name}) as span:
+            try:
+                return self._call_tool(tool_name, arguments, span)
+            except Exception as e:
+                span.record_exception(e)
+                print(f"Error calling Zoho MCP: {e}")
+                return None
+
+    def _call_tool(self, tool_name: str, arguments: Dict[str, Any], span: Span) -> Optional[Dict[str, Any]]:
+        # Construct Docker command
+        # Determine execution mode
+        execution_mode = os.getenv("MCP_EXECUTION_MODE", "docker")
+        span.set_attribute("mcp.execution_mode", execution_mode)
 
+        if execution_mode == "local":
+            # Run directly as a command (installed via pip)
+            cmd = ["zoho-analytics-mcp"]
+            # Pass environment variables to the subprocess
+            env = os.environ.copy()
+            env.update({
+                "ACCOUNTS_SERVER_URL": self.accounts_url,
+                "ANALYTICS_SERVER_URL": self.analytics_url,
+                "ANALYTICS_CLIENT_ID": self.client_id,
+                "ANALYTICS_CLIENT_SECRET": self.client_secret,
+                "ANALYTICS_REFRESH_TOKEN": self.refresh_token,
+            })
+        else:
+            # Default: Run via Docker
+            cmd = [
+                "docker", "run", "-i", "--rm",
+                "-e", f"ACCOUNTS_SERVER_URL={self.accounts_url}",
+                "-e", f"ANALYTICS_SERVER_URL={self.analytics_url}",
+                "-e", f"ANALYTICS_CLIENT_ID={self.client_id}",
+                "-e", f"ANALYTICS_CLIENT_SECRET={self.client_secret}",
+                "-e", f"ANALYTICS_REFRESH_TOKEN={self.refresh_token}",
+                "zohoanalytics/mcp-server:latest"
+            ]
+            env = None
+
+        # The server only shows it is ready by answering initialize, so the spawn span
+        # runs until that response and covers process (or container) startup.
+        with tracer.start_span("mcp.spawn") as spawn_span:
             process = subprocess.Popen(
                 cmd,
                 stdin=subprocess.PIPE,
@@ -85,54 +99,62 @@ class ZohoMCPClient:
                 bufsize=0,
                 env=env
             )
-            
-            # Initialize
-            init_request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {},
-                    "clientInfo": {"name": "swiggy-chatbot", "version": "1.0"}
+            try:
+                # Initialize
+                init_request = {
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "initialize",
+                    "params": {
+                        "protocolVersion": "2024-11-05",
+                        "capabilities": {},
+                        "clientInfo": {"name": "swiggy-chatbot", "version": "1.0"}
+                    }
                 }
-            }
-            process.stdin.write(json.dumps(init_request) + "\n")
-            process.stdin.flush()
-            response = process.stdout.readline()
-            
-            # Send initialized notification
-            notify = {"jsonrpc": "2.0", "method": "notifications/initialized"}
-            process.stdin.write(json.dumps(notify) + "\n")
-            process.stdin.flush()
-            
+                process.stdin.write(json.dumps(init_request) + "\n")
+                process.stdin.flush()
+                response = process.stdout.readline()
+            except BaseException:
+                process.terminate()
+                raise
+            spawn_span.set_attribute("mcp.response_bytes", len(response))
+
+        try:
+            with tracer.start_span("mcp.handshake"):
+                # Send initialized notification
+                notify = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+                process.stdin.write(json.dumps(notify) + "\n")
+                process.stdin.flush()
+
             # Call tool
-            call_request = {
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
+            with tracer.start_span("mcp.tools_call", **{"mcp.tool_name": tool_name}) as call_span:
+                call_request = {
+                    "jsonrpc": "2.0",
+                    "id": 2,
+                    "method": "tools/call",
+                    "params": {
+                        "name": tool_name,
+                        "arguments": arguments
+                    }
                 }
-            }
-            process.stdin.write(json.dumps(call_request) + "\n")
-            process.stdin.flush()
-            
-            response = process.stdout.readline()
+                payload = json.dumps(call_request) + "\n"
+                call_span.set_attribute("mcp.request_bytes", len(payload))
+                process.stdin.write(payload)
+                process.stdin.flush()
+
+                response = process.stdout.readline()
+                call_span.set_attribute("mcp.response_bytes", len(response))
+        finally:
             process.terminate()
-            
-            result = json.loads(response)
-            if "result" in result:
-                return result["result"]
-            if "error" in result:
-                print(f"MCP Error: {result['error']}")
-                return None
-            return None
-            
-        except Exception as e:
-            print(f"Error calling Zoho MCP: {e}")
+
+        result = json.loads(response)
+        if "result" in result:
+            return result["result"]
+        if "error" in result:
+            print(f"MCP Error: {result['error']}")
+            span.set_attribute("mcp.error", json.dumps(result["error"]))
             return None
+        return None
 
     def export_invoice_report(self, vendor_id: str) -> Optional[Dict[str, Any]]:
         """
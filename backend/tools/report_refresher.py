@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .zoho_service import ZohoAnalyticsService, zoho_service
+
+ReportKey = Tuple[str, str]
+
+
+class ReportRefresher:
+    """
+    Background stale-while-revalidate refresher for hot (report slug, PAN) pairs.
+    fetch_report traffic marks pairs as hot; a scheduler thread re-exports them shortly
+    before their cache entry expires. At most max_concurrency refreshes run at once so
+    background work cannot crowd out live requests.
+    """
+
+    def __init__(self, service: ZohoAnalyticsService) -> None:
+        self.service = service
+        self.max_concurrency = max(1, int(os.getenv("ZOHO_REFRESH_MAX_CONCURRENCY", "2")))
+        self.interval = float(os.getenv("ZOHO_REFRESH_INTERVAL_SECONDS", "30"))
+        self.hot_window = float(os.getenv("ZOHO_REFRESH_HOT_WINDOW_SECONDS", "1800"))
+        self.min_hits = max(1, int(os.getenv("ZOHO_REFRESH_MIN_HITS", "2")))
+        # Refresh once an entry has used up this fraction of its TTL.
+        self.refresh_ahead = float(os.getenv("ZOHO_REFRESH_AHEAD_RATIO", "0.8"))
+        self.active_hours = self._parse_active_hours(os.getenv("ZOHO_REFRESH_ACTIVE_HOURS", "9-21"))
+        # Active hours are vendor business hours, independent of the container's (usually UTC) clock.
+        self.timezone = self._parse_timezone(os.getenv("ZOHO_REFRESH_TZ", "Asia/Kolkata"))
+
+        self._lock = threading.Lock()
+        self._accesses: Dict[ReportKey, Deque[float]] = {}
+        # Set when the pair's refresh finishes, so live misses can wait instead of re-exporting.
+        self._in_flight: Dict[ReportKey, threading.Event] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self) -> None:
+        """Attach to the service and start the scheduler thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="report-refresh")
+        self.service.refresher = self
+        self._thread = threading.Thread(target=self._run, name="report-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detach from the service and stop scheduling; in-flight refreshes are not waited on."""
+        if self.service.refresher is self:
+            self.service.refresher = None
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def record_access(self, report_slug: str, pan: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            hits = self._accesses.setdefault((report_slug, pan), deque())
+            hits.append(now)
+            self._trim(hits, now)
+
+    def hot_keys(self, now: Optional[float] = None) -> List[ReportKey]:
+        """Pairs requested at least min_hits times within the hot window, most active first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for key in list(self._accesses):
+                hits = self._accesses[key]
+                self._trim(hits, now)
+                if not hits:
+                    del self._accesses[key]
+            hot = [key for key, hits in self._accesses.items() if len(hits) >= self.min_hits]
+            return sorted(hot, key=lambda key: len(self._accesses[key]), reverse=True)
+
+    def request_refresh(self, report_slug: str, pan: str) -> bool:
+        """
+        Schedule a background refresh unless one is already running for the pair or the
+        concurrency budget is spent. Returns True if a refresh was scheduled.
+        """
+        key = (report_slug, pan)
+        with self._lock:
+            if self._executor is None or key in self._in_flight or len(self._in_flight) >= self.max_concurrency:
+                return False
+            self._in_flight[key] = threading.Event()
+            executor = self._executor
+        try:
+            executor.submit(self._refresh, key)
+        except RuntimeError:
+            # Executor shut down between the check and the submit.
+            self._finish(key)
+            return False
+        return True
+
+    def wait_for_refresh(self, report_slug: str, pan: str) -> bool:
+        """
+        Block until an in-flight refresh of the pair finishes.
+        Returns False straight away if no refresh is running for it.
+        """
+        with self._lock:
+            finished = self._in_flight.get((report_slug, pan))
+        if finished is None:
+            return False
+        finished.wait()
+        return True
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """Schedule refreshes for hot pairs that are close to expiry. Returns the number scheduled."""
+        now = time.time() if now is None else now
+        self.service.prune_cache(now)
+        if not self._is_active(now) or not self.service.client.is_configured():
+            return 0
+
+        scheduled = 0
+        refresh_age = self.service.cache_ttl * self.refresh_ahead
+        for report_slug, pan in self.hot_keys(now):
+            cached = self.service.get_cached(report_slug, pan)
+            if cached is not None and now - cached.fetched_at < refresh_age:
+                continue
+            if self.request_refresh(report_slug, pan):
+                scheduled += 1
+        return scheduled
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as exc:  # pragma: no cover - keep the scheduler alive
+                print(f"Error scheduling report refreshes: {exc}")
+
+    def _refresh(self, key: ReportKey) -> None:
+        report_slug, pan = key
+        try:
+            self.service.refresh_report(report_slug, pan)
+        except Exception as exc:
+            print(f"Error refreshing '{report_slug}' for PAN {pan}: {exc}")
+        finally:
+            self._finish(key)
+
+    def _finish(self, key: ReportKey) -> None:
+        with self._lock:
+            finished = self._in_flight.pop(key, None)
+        if finished is not None:
+            finished.set()
+
+    def _trim(self, hits: Deque[float], now: float) -> None:
+        while hits and now - hits[0] > self.hot_window:
+            hits.popleft()
+
+    def _is_active(self, now: float) -> bool:
+        if self.active_hours is None:
+            return True
+        start_hour, end_hour = self.active_hours
+        if start_hour == end_hour:
+            return True
+        hour = datetime.fromtimestamp(now, tz=self.timezone).hour
+        if start_hour <= end_hour:
+            return start_hour <= hour < end_hour
+        return hour >= start_hour or hour < end_hour
+
+    def _parse_active_hours(self, raw_value: str) -> Optional[Tuple[int, int]]:
+        """Parse 'START-END' (24h, in ZOHO_REFRESH_TZ); an empty value means always active."""
+        if not raw_value.strip():
+            return None
+        try:
+            start, end = (int(part) for part in raw_value.split("-", 1))
+        except ValueError:
+            print(f"Invalid ZOHO_REFRESH_ACTIVE_HOURS '{raw_value}', refreshing at all hours")
+            return None
+        return start % 24, end % 24
+
+    def _parse_timezone(self, raw_value: str) -> Optional[ZoneInfo]:
+        if not raw_value.strip():
+            return None
+        try:
+            return ZoneInfo(raw_value.strip())
+        except (ZoneInfoNotFoundError, ValueError):
+            print(f"Unknown ZOHO_REFRESH_TZ '{raw_value}', using the process's local time")
+            return None
+
+
+# Singleton instance
+report_refresher = ReportRefresher(zoho_service)
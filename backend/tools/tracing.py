@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import random
+import secrets
+import tempfile
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A single timed operation, serialised in the OpenTelemetry JSON span shape."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        sampled: bool,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.sampled = sampled
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status_code = "STATUS_CODE_UNSET"
+        self.status_message: Optional[str] = None
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status_code = "STATUS_CODE_ERROR"
+        self.status_message = str(exc)
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_ns is None:
+            return None
+        return (self.end_time_ns - self.start_time_ns) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {"code": self.status_code}
+        if self.status_message:
+            status["message"] = self.status_message
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or self.start_time_ns),
+            "attributes": [_to_otel_attribute(key, value) for key, value in self.attributes.items()],
+            "status": status,
+        }
+
+
+class Tracer:
+    """
+    Minimal request-scoped tracer.
+    Sampling is decided once per trace (at the root span) and inherited by child spans;
+    every root span (chat requests, background refreshes, CLI exports) is sampled at
+    sample_rate. Each sampled span is appended to a size-rotated local file as one
+    OTLP/JSON line, readable by a collector's otlpjsonfile receiver.
+    """
+
+    SERVICE_NAME = "swiggy-vendor-chatbot"
+    SCOPE_NAME = "swiggy-vendor-chatbot.tracing"
+
+    def __init__(self) -> None:
+        self.sample_rate = _parse_sample_rate(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+        self.export_path = Path(
+            os.getenv("TRACE_EXPORT_PATH", str(Path(tempfile.gettempdir()) / "swiggy_chatbot_traces.jsonl"))
+        )
+        self.max_bytes = int(os.getenv("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+        self.backup_count = int(os.getenv("TRACE_BACKUP_COUNT", "5"))
+        self._logger: Optional[logging.Logger] = None
+
+    @contextmanager
+    def start_span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Open a span as a child of the current span (or as a new trace root)."""
+        parent = _current_span.get()
+        if parent is None:
+            span = Span(name, secrets.token_hex(16), None, random.random() < self.sample_rate, attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, parent.sampled, attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            span.end_time_ns = time.time_ns()
+            _current_span.reset(token)
+            if span.sampled:
+                self._export(span)
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def configure(self, sample_rate: Optional[float] = None, export_path: Optional[Path] = None) -> None:
+        """Change the sample rate and/or export file at runtime (used by the CLI and tests)."""
+        if sample_rate is not None:
+            self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        if export_path is not None and Path(export_path) != self.export_path:
+            self.export_path = Path(export_path)
+            self._close_logger()
+
+    def _export(self, span: Span) -> None:
+        record = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_to_otel_attribute("service.name", self.SERVICE_NAME)]},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": self.SCOPE_NAME},
+                            "spans": [span.to_dict()],
+                        }
+                    ],
+                }
+            ]
+        }
+        try:
+            self._get_logger().info(json.dumps(record, default=str))
+        except Exception as exc:  # pragma: no cover - tracing must never break a request
+            print(f"Error exporting span '{span.name}': {exc}")
+
+    def _get_logger(self) -> logging.Logger:
+        if self._logger is None:
+            self.export_path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                self.export_path,
+                maxBytes=self.max_bytes,
+                backupCount=self.backup_count,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger = logging.getLogger(f"{__name__}.{id(self)}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            self._logger = logger
+        return self._logger
+
+    def _close_logger(self) -> None:
+        if self._logger is None:
+            return
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+            handler.close()
+        self._logger = None
+
+
+def _to_otel_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        wrapped = {"boolValue": value}
+    elif isinstance(value, int):
+        wrapped = {"intValue": str(value)}
+    elif isinstance(value, float):
+        wrapped = {"doubleValue": value}
+    else:
+        wrapped = {"stringValue": str(value)}
+    return {"key": key, "value": wrapped}
+
+
+def _parse_sample_rate(raw_value: str) -> float:
+    try:
+        return min(max(float(raw_value), 0.0), 1.0)
+    except ValueError:
+        return 1.0
+
+
+# Singleton instance
+tracer = Tracer()
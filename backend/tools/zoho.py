@@ -1,5 +1,6 @@
 from typing import Any, Callable, Dict, List, Optional
 
+from tools.tracing import tracer
 from tools.zoho_service import ReportConfig, zoho_service
 
 tools_list: List[Callable[..., List[Dict[str, Any]]]] = []
@@ -7,7 +8,10 @@ tools_list: List[Callable[..., List[Dict[str, Any]]]] = []
 
 def _build_tool(slug: str, config: ReportConfig) -> Callable[[Optional[str]], List[Dict[str, Any]]]:
     def _tool(pan: Optional[str] = None) -> List[Dict[str, Any]]:
-        return zoho_service.fetch_report(slug, pan) or []
+        with tracer.start_span(f"tool.get_{slug}", **{"tool.name": f"get_{slug}", "tool.pan_provided": pan is not None}) as span:
+            rows = zoho_service.fetch_report(slug, pan) or []
+            span.set_attribute("tool.row_count", len(rows))
+            return rows
 
     _tool.__name__ = f"get_{slug}"
     _tool.__doc__ = f"Retrieve '{config.title}' data (View ID: {config.view_id})."
@@ -5,12 +5,19 @@ import json
 import os
 import re
 import tempfile
+import threading
+import time
+import uuid
 from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List, Mapping, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Mapping, Optional, Tuple
 
 from .mcp_client import zoho_mcp_client
+from .tracing import tracer
+
+if TYPE_CHECKING:
+    from .report_refresher import ReportRefresher
 
 
 @dataclass(frozen=True)
@@ -26,6 +33,14 @@ class ReportConfig:
     admin_page_url: Optional[str] = None
 
 
+@dataclass(frozen=True)
+class CachedReport:
+    """Rows exported for a (report slug, PAN) pair and when they were fetched."""
+
+    rows: List[Dict[str, Any]]
+    fetched_at: float
+
+
 class ZohoAnalyticsService:
     """
     Service that maps every report in VendorPortalReportsList.csv to an MCP tool call.
@@ -40,6 +55,13 @@ class ZohoAnalyticsService:
         self.export_dir = Path(os.getenv("ZOHO_EXPORT_DIR", tempfile.gettempdir()))
         self.export_dir.mkdir(parents=True, exist_ok=True)
         self._reports: "OrderedDict[str, ReportConfig]" = self._load_reports_from_csv()
+        # Exported rows are fresh for cache_ttl seconds, then may be served stale for a
+        # further cache_stale_ttl seconds while a background refresh is in flight.
+        self.cache_ttl = float(os.getenv("ZOHO_CACHE_TTL_SECONDS", "300"))
+        self.cache_stale_ttl = float(os.getenv("ZOHO_CACHE_STALE_SECONDS", "900"))
+        self._cache: Dict[Tuple[str, str], CachedReport] = {}
+        self._cache_lock = threading.Lock()
+        self.refresher: Optional["ReportRefresher"] = None
 
     @property
     def available_reports(self) -> Mapping[str, ReportConfig]:
@@ -55,13 +77,107 @@ class ZohoAnalyticsService:
         if not report:
             raise KeyError(f"Report '{report_slug}' was not found in VendorPortalReportsList.csv")
 
-        if not self.client.is_configured():
-            print("Zoho MCP not configured, returning None")
-            return None
+        with tracer.start_span("zoho.fetch_report", **{"report.slug": report_slug, "report.view_id": report.view_id}) as span:
+            if not self.client.is_configured():
+                print("Zoho MCP not configured, returning None")
+                span.set_attribute("zoho.configured", False)
+                return None
+
+            vendor_pan = pan or self.demo_pan
+            refresher = self.refresher
+            if refresher is not None:
+                refresher.record_access(report_slug, vendor_pan)
+
+            cached = self.get_cached(report_slug, vendor_pan)
+            if cached is not None:
+                age = time.time() - cached.fetched_at
+                if age < self.cache_ttl:
+                    span.set_attribute("cache.result", "hit")
+                    return cached.rows
+                if refresher is not None and age < self.cache_ttl + self.cache_stale_ttl:
+                    # Stale-while-revalidate: answer from cache, refresh in the background.
+                    span.set_attribute("cache.result", "stale")
+                    refresher.request_refresh(report_slug, vendor_pan)
+                    return cached.rows
+
+            if refresher is not None and refresher.wait_for_refresh(report_slug, vendor_pan):
+                # A background refresh was already exporting this pair; reuse its result.
+                cached = self.get_cached(report_slug, vendor_pan)
+                if cached is not None:
+                    span.set_attribute("cache.result", "joined_refresh")
+                    return cached.rows
+
+            span.set_attribute("cache.result", "miss")
+            rows = self.export_report(report_slug, vendor_pan)
+            if isinstance(rows, list):
+                span.set_attribute("report.row_count", len(rows))
+                self._store(report_slug, vendor_pan, rows)
+            return rows
+
+    def refresh_report(self, report_slug: str, pan: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Re-exports a report for a PAN and replaces its cache entry.
+        Used by the background refresher.
+        """
+        with tracer.start_span("zoho.refresh_report", **{"report.slug": report_slug}) as span:
+            rows = self.export_report(report_slug, pan)
+            if isinstance(rows, list):
+                span.set_attribute("report.row_count", len(rows))
+                self._store(report_slug, pan, rows)
+            return rows
+
+    def export_report(self, report_slug: str, pan: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Exports a report for a PAN without reading or updating the cache.
+        Every call writes to its own uniquely named file, removed once read, so callers
+        may export concurrently, even the same (report, PAN) pair or from another process.
+        """
+        report = self._reports.get(report_slug)
+        if not report:
+            raise KeyError(f"Report '{report_slug}' was not found in VendorPortalReportsList.csv")
+
+        with tracer.start_span("zoho.export_report", **{"report.slug": report_slug, "report.view_id": report.view_id}) as span:
+            if not self.client.is_configured():
+                span.set_attribute("zoho.configured", False)
+                return None
 
-        vendor_pan = pan or self.demo_pan
+            exports_dir = self.export_dir / "exports"
+            exports_dir.mkdir(parents=True, exist_ok=True)
+            output_file = exports_dir / f"{report_slug}_{uuid.uuid4().hex}.json"
+            try:
+                rows = self._export_report(report, pan, output_file)
+            finally:
+                output_file.unlink(missing_ok=True)
+            if isinstance(rows, list):
+                span.set_attribute("report.row_count", len(rows))
+            return rows
+
+    def get_cached(self, report_slug: str, pan: str) -> Optional[CachedReport]:
+        """Return the cache entry for a (report slug, PAN) pair, ignoring expiry."""
+        with self._cache_lock:
+            return self._cache.get((report_slug, pan))
+
+    def prune_cache(self, now: Optional[float] = None) -> int:
+        """Drop entries too old to be served even stale. Returns the number removed."""
+        now = time.time() if now is None else now
+        max_age = self.cache_ttl + self.cache_stale_ttl
+        with self._cache_lock:
+            expired = [key for key, entry in self._cache.items() if now - entry.fetched_at >= max_age]
+            for key in expired:
+                del self._cache[key]
+        return len(expired)
+
+    def _store(self, report_slug: str, pan: str, rows: List[Dict[str, Any]]) -> None:
+        if self.cache_ttl <= 0:
+            return
+        now = time.time()
+        # Stores follow a multi-second export, so a full sweep here is cheap by comparison.
+        self.prune_cache(now)
+        with self._cache_lock:
+            self._cache[(report_slug, pan)] = CachedReport(rows=rows, fetched_at=now)
+
+    def _export_report(self, report: ReportConfig, vendor_pan: str, output_file: Path) -> Optional[List[Dict[str, Any]]]:
         criteria = report.criteria_template.format(pan=vendor_pan)
-        output_file = self.export_dir / f"{report_slug}.json"
 
         print(f"Fetching '{report.title}' for PAN {vendor_pan} (View ID: {report.view_id})")
 
@@ -76,16 +192,19 @@ class ZohoAnalyticsService:
             },
         )
 
-        if output_file.exists():
+        if not output_file.exists():
+            return None
+
+        with tracer.start_span("zoho.read_export") as read_span:
             try:
+                read_span.set_attribute("file.size_bytes", output_file.stat().st_size)
                 with output_file.open("r", encoding="utf-8") as file_handle:
                     return json.load(file_handle)
             except Exception as exc:  # pragma: no cover - defensive logging
-                print(f"Error reading report output for {report_slug}: {exc}")
+                read_span.record_exception(exc)
+                print(f"Error reading report output for {report.slug}: {exc}")
                 return None
 
-        return None
-
     def _load_reports_from_csv(self) -> "OrderedDict[str, ReportConfig]":
         if not self.REPORTS_CSV.exists():
             raise FileNotFoundError(f"Unable to locate {self.REPORTS_CSV}")